@@ -0,0 +1,95 @@
+# backend/bench_coldstart.py
+"""
+Measure cold-start cost of the backend: module import time and the time to
+serve the first request to each route, in a fresh interpreter per mode.
+
+    python backend/bench_coldstart.py
+
+Build the snapshot first (`python backend/snapshot.py`) for the fast modes.
+Only fast_app.py is meant to meet the <100 ms cold-start target; main.py
+always pays for importing FastAPI.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+# Runs inside the child interpreter. Payload builders are called directly so
+# the numbers are not polluted by an HTTP client or server.
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import {module} as app
+t1 = time.perf_counter()
+parks = {parks}
+t2 = time.perf_counter()
+{forecast}
+t3 = time.perf_counter()
+{map}
+t4 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "first_parks_ms": (t2 - t1) * 1000,
+    "first_forecast_ms": (t3 - t2) * 1000,
+    "first_map_ms": (t4 - t3) * 1000,
+    "time_to_first_response_ms": (t2 - t0) * 1000,
+    "pandas_loaded": "pandas" in sys.modules,
+    "fastapi_loaded": "fastapi" in sys.modules,
+}}))
+"""
+
+MAIN_CALLS = {
+    "module": "main",
+    "parks": "app.parks_payload()",
+    "forecast": 'app.forecast_payload(parks["parks"][0], 36)',
+    "map": "app.map_payload(0)",
+}
+FAST_APP_CALLS = {
+    "module": "fast_app",
+    "parks": 'app.handle("/parks", {})',
+    "forecast": 'app.handle("/forecast", {"park": [parks["parks"][0]]})',
+    "map": 'app.handle("/map", {"index": ["0"]})',
+}
+MODES = (
+    ("main.py, csv (pandas)", MAIN_CALLS, "0"),
+    ("main.py, PARK_PULSE_FAST_START=1 (snapshot)", MAIN_CALLS, "1"),
+    ("fast_app.py (snapshot, stdlib only)", FAST_APP_CALLS, "1"),
+)
+TARGET_MS = 100
+
+
+def run_mode(calls: dict, fast_start: str) -> dict:
+    env = dict(os.environ, PARK_PULSE_FAST_START=fast_start)
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(**calls)],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    for label, calls, fast_start in MODES:
+        r = run_mode(calls, fast_start)
+        ttfr = r["time_to_first_response_ms"]
+        print(f"=== {label} ===")
+        print(f"import:                 {r['import_ms']:8.1f} ms")
+        print(f"first /parks:           {r['first_parks_ms']:8.1f} ms")
+        print(f"first /forecast:        {r['first_forecast_ms']:8.1f} ms")
+        print(f"first /map:             {r['first_map_ms']:8.1f} ms")
+        print(f"time to first response: {ttfr:8.1f} ms  "
+              f"({'under' if ttfr < TARGET_MS else 'OVER'} {TARGET_MS} ms target)")
+        print(f"pandas / fastapi loaded: {r['pandas_loaded']} / {r['fastapi_loaded']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# backend/encoding.py
+"""
+Content negotiation for API responses.
+
+Media types (Accept header):
+- application/json                                  row-oriented JSON (default)
+- application/vnd.parkpulse.columnar+json           one array per field
+- application/msgpack (or application/x-msgpack)    MessagePack, row-oriented
+- application/vnd.apache.arrow.stream               Arrow IPC stream
+
+Content codings (Accept-Encoding): br, gzip, identity.
+
+Encoded + compressed bodies are cached per (route key, media type, coding),
+so the map slider scrubbing through all 36 indexes only pays the encoding
+cost once per variant. Optional dependencies (msgpack, pyarrow, brotli) are
+imported lazily; media types whose library is missing are not offered.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Callable, Hashable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+if __package__:
+    from .headers import choose_coding, parse_q
+else:
+    from headers import choose_coding, parse_q
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.parkpulse.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+MEDIA_ALIASES = {"application/x-msgpack": MSGPACK}
+
+# Bodies smaller than this are not worth compressing.
+MIN_COMPRESS_BYTES = 512
+
+
+def _available_media_types() -> list[str]:
+    types = [JSON, COLUMNAR_JSON]
+    if find_spec("msgpack") is not None:
+        types.append(MSGPACK)
+    if find_spec("pyarrow") is not None:
+        types.append(ARROW)
+    return types
+
+
+def _available_codings() -> list[str]:
+    codings = ["gzip", "identity"]
+    if find_spec("brotli") is not None:
+        codings.insert(0, "br")
+    return codings
+
+
+MEDIA_TYPES = _available_media_types()
+CODINGS = _available_codings()
+
+
+# ---------------------------------------------------------------------
+# Negotiation (header parsing lives in headers.py)
+# ---------------------------------------------------------------------
+
+def negotiate_media_type(accept: str | None) -> str:
+    if not accept:
+        return JSON
+
+    ranked = [(MEDIA_ALIASES.get(token, token), q) for token, q in parse_q(accept)]
+    # explicit q=0 refuses a type even when a wildcard would otherwise match it
+    refused = {token for token, q in ranked if q <= 0}
+
+    for token, q in ranked:
+        if q <= 0:
+            continue
+        if token in ("*/*", "application/*"):
+            allowed = [t for t in MEDIA_TYPES if t not in refused]
+            if allowed:
+                return allowed[0]
+            continue
+        if token in MEDIA_TYPES:
+            return token
+
+    raise HTTPException(406, f"Not acceptable. Supported media types: {', '.join(MEDIA_TYPES)}")
+
+
+def negotiate_coding(accept_encoding: str | None) -> str:
+    if not accept_encoding:
+        return "identity"
+    coding = choose_coding(accept_encoding, CODINGS)
+    if coding is None:
+        raise HTTPException(406, f"Not acceptable. Supported content codings: {', '.join(CODINGS)}")
+    return coding
+
+
+# ---------------------------------------------------------------------
+# Encoders
+# ---------------------------------------------------------------------
+
+def to_columnar(payload: dict) -> dict:
+    """Turn every list-of-records value into a dict of per-field arrays."""
+    out = {}
+    for key, value in payload.items():
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            fields = list(value[0])
+            out[key] = {f: [row.get(f) for row in value] for f in fields}
+        else:
+            out[key] = value
+    return out
+
+
+def _encode_json(payload: dict) -> bytes:
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _encode_msgpack(payload: dict) -> bytes:
+    import msgpack
+
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _encode_arrow(payload: dict) -> bytes:
+    """
+    The first list-of-records value becomes the Arrow table; the remaining
+    scalar fields (index, count, park, ...) travel as JSON schema metadata.
+    Payloads without a list (rollup cells) become a one-row table of their
+    fields.
+    """
+    import pyarrow as pa
+
+    table_key = next(
+        (k for k, v in payload.items() if isinstance(v, list)),
+        None,
+    )
+    if table_key is None:
+        table, envelope = pa.Table.from_pylist([payload]), {}
+    else:
+        rows = payload[table_key]
+        if rows and isinstance(rows[0], dict):
+            table = pa.Table.from_pylist(rows)
+        else:
+            table = pa.table({table_key: rows})
+        envelope = {k: v for k, v in payload.items() if k != table_key}
+
+    table = table.replace_schema_metadata(
+        {"parkpulse": json.dumps({"table": table_key, **envelope})}
+    )
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(payload: dict, media_type: str) -> bytes:
+    if media_type == COLUMNAR_JSON:
+        return _encode_json(to_columnar(payload))
+    if media_type == MSGPACK:
+        return _encode_msgpack(payload)
+    if media_type == ARROW:
+        return _encode_arrow(payload)
+    return _encode_json(payload)
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "gzip":
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if coding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=11)
+    return body
+
+
+# ---------------------------------------------------------------------
+# Cached negotiated responses
+# ---------------------------------------------------------------------
+
+class ResponseCache:
+    """
+    Small LRU of (body, content coding) pairs keyed by
+    (route key, media type, requested coding).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, tuple[bytes, str]] = OrderedDict()
+        # sync routes run in FastAPI's thread pool
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[bytes, str] | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: tuple[bytes, str]) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+response_cache = ResponseCache()
+
+
+def negotiated_response(
+    request: Request,
+    key: Hashable,
+    build_payload: Callable[[], dict],
+) -> Response:
+    """
+    Encode `build_payload()` per the request's Accept / Accept-Encoding
+    headers. `key` must identify the payload (route + query params); the
+    payload builder is only called on a cache miss for the identity body.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    coding = negotiate_coding(request.headers.get("accept-encoding"))
+
+    cached = response_cache.get((key, media_type, coding))
+    if cached is None:
+        raw = response_cache.get((key, media_type, "identity"))
+        if raw is None:
+            raw = encode(jsonable_encoder(build_payload()), media_type), "identity"
+            response_cache.put((key, media_type, "identity"), raw)
+        if coding == "identity" or len(raw[0]) < MIN_COMPRESS_BYTES:
+            cached = raw
+        else:
+            cached = compress(raw[0], coding), coding
+        response_cache.put((key, media_type, coding), cached)
+    body, coding = cached
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type=media_type, headers=headers)
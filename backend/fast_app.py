@@ -0,0 +1,124 @@
+# backend/fast_app.py
+"""
+Minimal ASGI entry point for serverless cold starts.
+
+Serves /parks, /forecast and /map straight from the binary snapshot using
+only the standard library, so a cold instance does not pay for importing
+FastAPI (~350-500 ms) or pandas. Responses match main.py's snapshot path;
+the full app (vintages, rollups, content negotiation) stays in main.py.
+
+    uvicorn fast_app:app            # from backend/
+    uvicorn backend.fast_app:app    # from the repo root
+
+Build the snapshot first: `python backend/snapshot.py`.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+from urllib.parse import parse_qs
+
+if __package__:
+    from .headers import choose_coding
+    from .snapshot import SNAPSHOT_PATH, Snapshot, read_snapshot
+else:
+    from headers import choose_coding
+    from snapshot import SNAPSHOT_PATH, Snapshot, read_snapshot
+
+# Same origins as the CORS middleware in main.py
+ALLOWED_ORIGINS = {"http://localhost:3000", "http://127.0.0.1:3000"}
+MIN_COMPRESS_BYTES = 512
+CODINGS = ["gzip", "identity"]
+
+_snapshot: Snapshot | None = None
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, detail: str):
+        self.status = status
+        self.detail = detail
+
+
+def load_snapshot() -> Snapshot:
+    global _snapshot
+    if _snapshot is None:
+        if not SNAPSHOT_PATH.exists():
+            raise HTTPError(500, f"Snapshot file not found: {SNAPSHOT_PATH}")
+        _snapshot = read_snapshot(SNAPSHOT_PATH)
+    return _snapshot
+
+
+def int_param(query: dict, name: str, default: int, lo: int, hi: int) -> int:
+    raw = query.get(name, [None])[0]
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise HTTPError(422, f"'{name}' must be an integer")
+    if not lo <= value <= hi:
+        raise HTTPError(422, f"'{name}' must be between {lo} and {hi}")
+    return value
+
+
+def handle(path: str, query: dict) -> dict:
+    snap = load_snapshot()
+    if path == "/parks":
+        return snap.parks_payload()
+    if path == "/forecast":
+        park = query.get("park", [None])[0]
+        if park is None:
+            raise HTTPError(422, "'park' is required")
+        months = int_param(query, "months", 36, 1, 120)
+        try:
+            return snap.forecast_payload(park, months)
+        except KeyError:
+            raise HTTPError(404, f"Unknown park '{park}'. Try /parks")
+    if path == "/map":
+        return snap.map_payload(int_param(query, "index", 0, 0, 35))
+    raise HTTPError(404, "Not Found")
+
+
+async def app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+    out_headers = []
+    origin = headers.get("origin")
+    if origin in ALLOWED_ORIGINS:
+        out_headers += [
+            (b"access-control-allow-origin", origin.encode("latin-1")),
+            (b"access-control-allow-credentials", b"true"),
+        ]
+
+    if scope["method"] == "OPTIONS":  # CORS preflight
+        out_headers += [
+            (b"access-control-allow-methods", b"GET, HEAD, OPTIONS"),
+            (b"access-control-allow-headers", headers.get("access-control-request-headers", "*").encode("latin-1")),
+        ]
+        await send({"type": "http.response.start", "status": 204, "headers": out_headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    accept_encoding = headers.get("accept-encoding")
+    coding = choose_coding(accept_encoding, CODINGS) if accept_encoding else "identity"
+    try:
+        if coding is None:
+            raise HTTPError(406, f"Not acceptable. Supported content codings: {', '.join(CODINGS)}")
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPError(405, "Method Not Allowed")
+        payload = handle(scope["path"], parse_qs(scope["query_string"].decode("latin-1")))
+        status = 200
+    except HTTPError as e:
+        payload, status = {"detail": e.detail}, e.status
+
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+    out_headers += [(b"content-type", b"application/json"), (b"vary", b"Origin, Accept-Encoding")]
+    if coding == "gzip" and len(body) >= MIN_COMPRESS_BYTES:
+        body = gzip.compress(body, compresslevel=6, mtime=0)
+        out_headers.append((b"content-encoding", b"gzip"))
+    out_headers.append((b"content-length", str(len(body)).encode()))
+
+    await send({"type": "http.response.start", "status": status, "headers": out_headers})
+    await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
@@ -0,0 +1,44 @@
+# backend/headers.py
+"""
+Accept / Accept-Encoding parsing shared by main.py (via encoding.py) and
+fast_app.py. Standard library only, so the cold-start entry point can use it
+without importing FastAPI.
+"""
+from __future__ import annotations
+
+
+def parse_q(header: str) -> list[tuple[str, float]]:
+    """Split an Accept-style header into (token, q) pairs, highest q first."""
+    items = []
+    for i, part in enumerate(header.split(",")):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        items.append((token.lower(), q, i))
+    # stable: ties keep header order
+    items.sort(key=lambda t: (-t[1], t[2]))
+    return [(token, q) for token, q, _ in items]
+
+
+def choose_coding(accept_encoding: str, codings: list[str]) -> str | None:
+    """
+    Highest-q coding from `codings` (server preference order, which only
+    breaks ties). Codings the header does not name get the `*` q-value;
+    identity stays acceptable unless refused by `identity;q=0` or `*;q=0`.
+    Returns None when nothing is acceptable.
+    """
+    accepted = dict(parse_q(accept_encoding))
+    best, best_q = None, 0.0
+    for coding in codings:
+        default = 1.0 if coding == "identity" else 0.0
+        q = accepted.get(coding, accepted.get("*", default))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
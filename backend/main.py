@@ -1,16 +1,51 @@
-from fastapi import FastAPI, Query, HTTPException
+from __future__ import annotations
+
+import json
+import os
+import sys
+from fastapi import FastAPI, Query, HTTPException, Request
 from pathlib import Path
-import pandas as pd
+from typing import TYPE_CHECKING
 from fastapi.middleware.cors import CORSMiddleware
 from functools import lru_cache
 
+if __package__:  # imported as `backend.main` (from the repo root)
+    from .encoding import negotiated_response
+    from .snapshot import SNAPSHOT_PATH, Snapshot, read_snapshot
+else:  # run from backend/: `uvicorn main:app`
+    from encoding import negotiated_response
+    from snapshot import SNAPSHOT_PATH, Snapshot, read_snapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 app = FastAPI()
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 FORECAST_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_all_parks_36m.csv"
 META_PATH = PROJECT_ROOT / "ml" / "data" / "parks_metadata.csv"
+CUBES_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_cubes.json"
+
+# ml/ is a flat script directory (its modules import each other by bare name,
+# e.g. `from atomic import ...`), so it goes on the import path once, here,
+# for the pipeline modules the backend reads (vintages).
+ML_DIR = str(PROJECT_ROOT / "ml")
+if ML_DIR not in sys.path:
+    sys.path.append(ML_DIR)
+
+# Serverless cold-start mode: serve from the binary snapshot (built with
+# `python backend/snapshot.py`) so pandas is never imported on the request path.
+FAST_START = os.environ.get("PARK_PULSE_FAST_START", "").lower() in ("1", "true", "yes")
+
+@lru_cache(maxsize=1)
+def load_snapshot() -> Snapshot:
+    if not SNAPSHOT_PATH.exists():
+        raise HTTPException(500, f"Snapshot file not found: {SNAPSHOT_PATH}")
+    return read_snapshot(SNAPSHOT_PATH)
 
 @lru_cache(maxsize=1)
 def load_meta_df() -> pd.DataFrame:
+    import pandas as pd
+
     if not META_PATH.exists():
         raise HTTPException(500, f"Metadata file not found: {META_PATH}")
     meta = pd.read_csv(META_PATH)
@@ -19,48 +54,93 @@ def load_meta_df() -> pd.DataFrame:
 
 @lru_cache(maxsize=1)
 def load_forecast_df() -> pd.DataFrame:
+    import pandas as pd
+
     if not FORECAST_PATH.exists():
         raise HTTPException(500, f"Forecast file not found: {FORECAST_PATH}")
     df = pd.read_csv(FORECAST_PATH)
     df["ParkName"] = df["ParkName"].astype(str).str.strip()
     return df
 
-@app.get("/parks")
-def parks():
+# ---------------------------------------------------------------------
+# Forecast vintages (ml/vintages.py): every forecast run, stored as deltas
+# ---------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def vintage_store():
+    from vintages import VintageStore
+
+    return VintageStore()
+
+def resolve_vintage(as_of: str | None) -> str | None:
+    """Map an `as_of` query value (vintage id or YYYY-MM-DD) to a vintage id."""
+    if as_of is None:
+        return None
+    try:
+        return vintage_store().resolve(as_of)
+    except KeyError as e:
+        raise HTTPException(404, str(e.args[0]))
+
+@lru_cache(maxsize=8)
+def load_vintage_df(vintage_id: str) -> pd.DataFrame:
+    return vintage_store().load(vintage_id)
+
+def forecast_frame(vintage_id: str | None) -> pd.DataFrame:
+    if vintage_id is None:
+        return load_forecast_df()
+    return load_vintage_df(vintage_id)
+
+def parks_payload() -> dict:
+    if FAST_START:
+        return load_snapshot().parks_payload()
+
     df = load_forecast_df()
     parks = sorted(df["ParkName"].unique().tolist())
     return {"count": len(parks), "parks": parks}
 
-@app.get("/forecast")
-def forecast(
-    park: str = Query(...),
-    months: int = Query(36, ge=1, le=120),
-):
-    df = load_forecast_df()
-
+def forecast_payload(park: str, months: int, vintage_id: str | None = None) -> dict:
     park_clean = park.strip()
+
+    if FAST_START and vintage_id is None:
+        try:
+            return load_snapshot().forecast_payload(park_clean, months)
+        except KeyError:
+            raise HTTPException(404, f"Unknown park '{park}'. Try /parks")
+
+    df = forecast_frame(vintage_id)
+
     park_df = df[df["ParkName"].str.lower() == park_clean.lower()].copy()
 
     if park_df.empty:
         raise HTTPException(404, f"Unknown park '{park}'. Try /parks")
 
     park_df = park_df.sort_values(["Year", "Month"]).head(months)
+    # echo the stored spelling: responses are cached per case-folded name
+    park_name = park_df["ParkName"].iloc[0]
 
     records = park_df[
         ["Year", "Month", "predicted_visits", "crowd_level", "low_threshold", "high_threshold"]
     ].to_dict(orient="records")
 
-    return {"park": park_clean, "months": months, "forecast": records}
-@app.get("/map")
-def map_data(index: int = Query(0, ge=0, le=35)):
+    out = {"park": park_name, "months": months, "forecast": records}
+    if vintage_id is not None:
+        out["vintage"] = vintage_id
+    return out
+
+def map_payload(index: int, vintage_id: str | None = None) -> dict:
     """
     Returns ONE row per park for a given forecast step (0..35),
     merged with park coordinates.
 
     index=0 = first forecast month for each park
     index=35 = last forecast month
+
+    vintage_id selects a stored forecast vintage instead of the latest CSV.
     """
-    fc = load_forecast_df().copy()
+    if FAST_START and vintage_id is None:
+        return load_snapshot().map_payload(index)
+
+    fc = forecast_frame(vintage_id).copy()
     meta = load_meta_df().copy()
 
     # sort so "index" means the same thing for every park
@@ -81,7 +161,191 @@ def map_data(index: int = Query(0, ge=0, le=35)):
     out = out.dropna(subset=["Latitude", "Longitude"])
     records = out.to_dict(orient="records")
 
-    return {"index": index, "count": len(records), "parks": records}
+    result = {"index": index, "count": len(records), "parks": records}
+    if vintage_id is not None:
+        result["vintage"] = vintage_id
+    return result
+
+# ---------------------------------------------------------------------
+# Aggregation cubes (ml/cubes.py): state / season / national rollups
+# ---------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def load_cubes() -> dict:
+    if not CUBES_PATH.exists():
+        raise HTTPException(500, f"Cubes file not found: {CUBES_PATH}")
+    return json.loads(CUBES_PATH.read_text())
+
+@lru_cache(maxsize=1)
+def state_names() -> dict[str, str]:
+    """Lowercased state -> state as spelled in the park metadata."""
+    return {p["state"].lower(): p["state"] for p in load_cubes()["parks"].values()}
+
+def canonical_state(state: str) -> str:
+    name = state_names().get(state.strip().lower())
+    if name is None:
+        raise HTTPException(404, f"No forecast data for state '{state.strip()}'")
+    return name
+
+# Calendar months per season; winter Y runs Dec Y-1 - Feb Y (see ml/cubes.py)
+SEASON_MONTHS = {"winter": (12, 1, 2), "spring": (3, 4, 5), "summer": (6, 7, 8), "fall": (9, 10, 11)}
+
+def season_coverage(season: str, year: int) -> dict:
+    """
+    How many of the season's months fall inside the forecast horizon.
+    Seasons at either end of the 36 months are only partly covered, so
+    their totals are not comparable with full seasons.
+    """
+    horizon = load_cubes()["cubes"]["national_month"]
+    months = [(year - 1 if m == 12 else year, m) for m in SEASON_MONTHS[season]]
+    covered = sum(f"{y}|{m}" in horizon for y, m in months)
+    return {"months_expected": len(months), "months_covered": covered, "partial": covered < len(months)}
+
+def rollup_cell(dimension: str, key: str, label: str) -> dict:
+    """Cube cell as API fields; `label` names the state/period in the 404."""
+    cell = load_cubes()["cubes"][dimension].get(key.lower())
+    if cell is None:
+        raise HTTPException(404, f"No forecast data for {label}")
+    total = cell["sum_milli"] / 1000
+    return {
+        "predicted_visits_sum": total,
+        "predicted_visits_mean": total / cell["count"],
+        "park_months": cell["count"],
+        "crowd_levels": {lvl: cell[lvl] for lvl in ("low", "medium", "high")},
+    }
+
+# Routes negotiate the response encoding (JSON, columnar JSON, MessagePack,
+# Arrow) and compression (br, gzip) from the Accept / Accept-Encoding headers.
+# See encoding.py.
+
+@app.get("/parks")
+def parks(request: Request):
+    return negotiated_response(request, ("parks",), parks_payload)
+
+@app.get("/forecast")
+def forecast(
+    request: Request,
+    park: str = Query(...),
+    months: int = Query(36, ge=1, le=120),
+    as_of: str | None = Query(None, description="Vintage id or YYYY-MM-DD"),
+):
+    vintage_id = resolve_vintage(as_of)
+    key = ("forecast", park.strip().lower(), months, vintage_id)
+    return negotiated_response(request, key, lambda: forecast_payload(park, months, vintage_id))
+
+@app.get("/map")
+def map_data(
+    request: Request,
+    index: int = Query(0, ge=0, le=35),
+    as_of: str | None = Query(None, description="Vintage id or YYYY-MM-DD"),
+):
+    vintage_id = resolve_vintage(as_of)
+    key = ("map", index, vintage_id)
+    return negotiated_response(request, key, lambda: map_payload(index, vintage_id))
+
+@app.get("/vintages")
+def vintages():
+    vintages = vintage_store().list()
+    return {"count": len(vintages), "vintages": vintages}
+
+@app.get("/vintages/diff")
+def vintages_diff(
+    request: Request,
+    from_: str = Query(..., alias="from", description="Vintage id or YYYY-MM-DD"),
+    to: str = Query(..., description="Vintage id or YYYY-MM-DD"),
+):
+    """
+    Rows (park x month) added, removed or changed between two vintages,
+    with before/after values and the change in predicted visits.
+    """
+    from_id, to_id = resolve_vintage(from_), resolve_vintage(to)
+
+    def build() -> dict:
+        changes = vintage_store().diff(from_id, to_id)
+        changes = changes.astype(object).where(changes.notna(), None)
+        records = changes.to_dict(orient="records")
+        return {"from": from_id, "to": to_id, "count": len(records), "changes": records}
+
+    return negotiated_response(request, ("vintages/diff", from_id, to_id), build)
+
+# Rollups answer from the precomputed cubes; the cache key uses the
+# canonical state name so every spelling shares one entry.
+
+@app.get("/rollup/state")
+def rollup_state(
+    request: Request,
+    state: str = Query(...),
+    year: int = Query(...),
+    month: int | None = Query(None, ge=1, le=12),
+    season: str | None = Query(None, pattern="^(winter|spring|summer|fall)$"),
+):
+    """
+    Totals for one state, either for a month or for a season
+    (December counts toward the next year's winter). Season totals report
+    months_covered / months_expected and `partial`, since seasons at the
+    ends of the forecast horizon are only partly forecast.
+    """
+    if (month is None) == (season is None):
+        raise HTTPException(422, "Pass exactly one of 'month' or 'season'")
+    state = canonical_state(state)
+    if month is not None:
+        return negotiated_response(
+            request,
+            ("rollup/state", state, year, "month", month),
+            lambda: {"state": state, "year": year, "month": month,
+                     **rollup_cell("state_month", f"{state}|{year}|{month}", f"{state} in {year}-{month:02d}")},
+        )
+    return negotiated_response(
+        request,
+        ("rollup/state", state, year, "season", season),
+        lambda: {"state": state, "year": year, "season": season,
+                 **rollup_cell("state_season", f"{state}|{season}|{year}", f"{state} in {season} {year}"),
+                 **season_coverage(season, year)},
+    )
+
+@app.get("/rollup/season")
+def rollup_season(
+    request: Request,
+    season: str = Query(..., pattern="^(winter|spring|summer|fall)$"),
+    year: int = Query(...),
+):
+    return negotiated_response(
+        request,
+        ("rollup/season", season, year),
+        lambda: {"season": season, "year": year,
+                 **rollup_cell("season", f"{season}|{year}", f"{season} {year}"),
+                 **season_coverage(season, year)},
+    )
+
+@app.get("/rollup/national")
+def rollup_national(
+    request: Request,
+    year: int | None = Query(None),
+    month: int | None = Query(None, ge=1, le=12),
+):
+    """
+    National totals for one month, or the whole monthly load curve when
+    year/month are omitted.
+    """
+    if year is not None and month is not None:
+        return negotiated_response(
+            request,
+            ("rollup/national", year, month),
+            lambda: {"year": year, "month": month,
+                     **rollup_cell("national_month", f"{year}|{month}", f"{year}-{month:02d}")},
+        )
+    if year is not None or month is not None:
+        raise HTTPException(422, "Pass both 'year' and 'month', or neither")
+
+    def build() -> dict:
+        periods = sorted(tuple(map(int, k.split("|"))) for k in load_cubes()["cubes"]["national_month"])
+        curve = [
+            {"year": y, "month": m, **rollup_cell("national_month", f"{y}|{m}", f"{y}-{m:02d}")}
+            for y, m in periods
+        ]
+        return {"count": len(curve), "months": curve}
+
+    return negotiated_response(request, ("rollup/national",), build)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,176 @@
+# backend/snapshot.py
+"""
+Compact binary snapshot of the forecast + park metadata.
+
+The backend reads this file on cold start instead of parsing the CSVs with
+pandas, so the request path only needs the standard library. The snapshot is
+a pickled dict of column arrays (`array.array`), with the park names and
+crowd levels dictionary-encoded as small integer codes. It is a trusted,
+locally built artifact; never point SNAPSHOT_PATH at untrusted input.
+
+Build it after every forecast run:
+
+    python backend/snapshot.py
+"""
+from __future__ import annotations
+
+import os
+import pickle
+from array import array
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FORECAST_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_all_parks_36m.csv"
+META_PATH = PROJECT_ROOT / "ml" / "data" / "parks_metadata.csv"
+SNAPSHOT_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_snapshot.bin"
+
+SNAPSHOT_MAGIC = "park-pulse-snapshot"
+SNAPSHOT_VERSION = 1
+CROWD_LEVELS = ("low", "medium", "high")
+
+
+class Snapshot:
+    """
+    Forecast rows grouped per park (sorted by Year, Month) plus coordinates.
+
+    `forecast[park]` is a list of dicts with the same keys the CSV-backed
+    routes return, so both code paths serialize identically.
+    """
+
+    def __init__(self, forecast: dict[str, list[dict]], meta: dict[str, dict]):
+        self.forecast = forecast
+        self.meta = meta
+        self._by_lower = {name.lower(): name for name in forecast}
+
+    @property
+    def parks(self) -> list[str]:
+        return sorted(self.forecast)
+
+    # Response bodies for the snapshot-backed routes (shared by main.py and
+    # fast_app.py). Unknown parks raise KeyError.
+
+    def parks_payload(self) -> dict:
+        parks = self.parks
+        return {"count": len(parks), "parks": parks}
+
+    def forecast_payload(self, park: str, months: int) -> dict:
+        name = self._by_lower.get(park.strip().lower())
+        if name is None:
+            raise KeyError(park)
+        return {"park": name, "months": months, "forecast": self.forecast[name][:months]}
+
+    def map_payload(self, index: int) -> dict:
+        records = []
+        for name in self.parks:
+            rows = self.forecast[name]
+            coords = self.meta.get(name)
+            if index >= len(rows) or coords is None:
+                continue
+            row = rows[index]
+            records.append(
+                {
+                    "ParkName": name,
+                    "Year": row["Year"],
+                    "Month": row["Month"],
+                    "predicted_visits": row["predicted_visits"],
+                    "crowd_level": row["crowd_level"],
+                    **coords,
+                }
+            )
+        return {"index": index, "count": len(records), "parks": records}
+
+
+# ---------------------------------------------------------------------
+# Writing (pipeline side, needs pandas)
+# ---------------------------------------------------------------------
+
+def build_snapshot(
+    forecast_path: Path = FORECAST_PATH,
+    meta_path: Path = META_PATH,
+    out_path: Path = SNAPSHOT_PATH,
+) -> Path:
+    """Encode the forecast + metadata CSVs into a snapshot file."""
+    import pandas as pd
+
+    fc = pd.read_csv(forecast_path)
+    fc["ParkName"] = fc["ParkName"].astype(str).str.strip()
+    fc = fc.sort_values(["ParkName", "Year", "Month"]).reset_index(drop=True)
+
+    meta = pd.read_csv(meta_path)
+    meta["ParkName"] = meta["ParkName"].astype(str).str.strip()
+
+    park_names = sorted(fc["ParkName"].unique().tolist())
+    park_code = {name: i for i, name in enumerate(park_names)}
+    crowd_code = {level: i for i, level in enumerate(CROWD_LEVELS)}
+
+    thresholds = fc.groupby("ParkName")[["low_threshold", "high_threshold"]].first()
+
+    payload = {
+        "magic": SNAPSHOT_MAGIC,
+        "version": SNAPSHOT_VERSION,
+        "parks": park_names,
+        "crowd_levels": list(CROWD_LEVELS),
+        "park": array("H", fc["ParkName"].map(park_code).astype(int).tolist()),
+        "year": array("H", fc["Year"].astype(int).tolist()),
+        "month": array("B", fc["Month"].astype(int).tolist()),
+        "predicted_visits": array("d", fc["predicted_visits"].astype(float).tolist()),
+        "crowd_level": array("B", fc["crowd_level"].map(crowd_code).astype(int).tolist()),
+        "low_threshold": array("d", thresholds.loc[park_names, "low_threshold"].astype(float).tolist()),
+        "high_threshold": array("d", thresholds.loc[park_names, "high_threshold"].astype(float).tolist()),
+        "meta": {
+            row.ParkName: {"Latitude": float(row.Latitude), "Longitude": float(row.Longitude)}
+            for row in meta.itertuples(index=False)
+            if pd.notna(row.Latitude) and pd.notna(row.Longitude)
+        },
+    }
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# ---------------------------------------------------------------------
+# Reading (request side, standard library only)
+# ---------------------------------------------------------------------
+
+def read_snapshot(path: Path = SNAPSHOT_PATH) -> Snapshot:
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+
+    if payload.get("magic") != SNAPSHOT_MAGIC or payload.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot format in {path}")
+
+    parks = payload["parks"]
+    levels = payload["crowd_levels"]
+    low = payload["low_threshold"]
+    high = payload["high_threshold"]
+
+    forecast: dict[str, list[dict]] = {name: [] for name in parks}
+    for p, y, m, v, c in zip(
+        payload["park"],
+        payload["year"],
+        payload["month"],
+        payload["predicted_visits"],
+        payload["crowd_level"],
+    ):
+        forecast[parks[p]].append(
+            {
+                "Year": y,
+                "Month": m,
+                "predicted_visits": v,
+                "crowd_level": levels[c],
+                "low_threshold": low[p],
+                "high_threshold": high[p],
+            }
+        )
+
+    return Snapshot(forecast, payload["meta"])
+
+
+if __name__ == "__main__":
+    out = build_snapshot()
+    print(f"Snapshot saved -> {out}")
+    print(f"Size: {out.stat().st_size:,} bytes")
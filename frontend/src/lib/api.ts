@@ -100,14 +100,79 @@ export async function getParks(): Promise<string[]> {
   return index.map((p) => p.name);
 }
 
+/**
+ * Columnar copy of map_by_index.json written by ml/build_map_static.py
+ * (~10x smaller before compression). `park` indexes into `parks`,
+ * `crowd_level` indexes into `crowdLevels`.
+ */
+type MapByIndexColumnar = {
+  format: "columnar-v1";
+  baseYear: number;
+  baseMonth: number;
+  crowdLevels: Crowd[];
+  parks: { ParkName: string[]; Latitude: number[]; Longitude: number[] };
+  months: {
+    index: number;
+    park: number[];
+    Year: number[];
+    Month: number[];
+    predicted_visits: number[];
+    crowd_level: number[];
+  }[];
+};
+
+const MAP_COLUMNAR_PATH = "/data/map_by_index.columnar.json";
+
+/**
+ * Fetch the precompressed .br / .gz copy and inflate it in the browser when
+ * DecompressionStream supports the format; otherwise fall back to the plain
+ * columnar file (which the host may still compress on the wire).
+ */
+async function fetchColumnarMap(): Promise<MapByIndexColumnar> {
+  if (typeof DecompressionStream !== "undefined") {
+    const variants: [string, string][] = [
+      [".br", "brotli"],
+      [".gz", "gzip"],
+    ];
+    for (const [ext, format] of variants) {
+      try {
+        const stream = new DecompressionStream(format as CompressionFormat);
+        const res = await fetch(MAP_COLUMNAR_PATH + ext, { cache: "no-store" });
+        if (!res.ok || !res.body) continue;
+        const text = await new Response(res.body.pipeThrough(stream)).text();
+        return JSON.parse(text) as MapByIndexColumnar;
+      } catch {
+        // format unsupported by this browser, or the host already decoded it
+      }
+    }
+  }
+  return fetchJSON<MapByIndexColumnar>(MAP_COLUMNAR_PATH);
+}
+
 export async function getMapByIndex(): Promise<MapByIndex> {
-  const data = await fetchJSON<MapByIndex>("/data/map_by_index.json");
+  const data = await fetchColumnarMap();
 
-  if (!data || !Array.isArray(data.months)) {
-    throw new Error("Invalid /data/map_by_index.json format. Expected { baseYear, baseMonth, months[] }");
+  if (!data || data.format !== "columnar-v1" || !Array.isArray(data.months)) {
+    throw new Error(`Invalid ${MAP_COLUMNAR_PATH} format. Expected columnar-v1`);
   }
 
-  return data;
+  const { ParkName, Latitude, Longitude } = data.parks;
+  return {
+    baseYear: data.baseYear,
+    baseMonth: data.baseMonth,
+    months: data.months.map((m) => ({
+      index: m.index,
+      parks: m.park.map((p, i) => ({
+        ParkName: ParkName[p],
+        Year: m.Year[i],
+        Month: m.Month[i],
+        predicted_visits: m.predicted_visits[i],
+        crowd_level: data.crowdLevels[m.crowd_level[i]],
+        Latitude: Latitude[p],
+        Longitude: Longitude[p],
+      })),
+    })),
+  };
 }
 
 
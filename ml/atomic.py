@@ -0,0 +1,27 @@
+# ml/atomic.py
+"""
+Atomic file writes for pipeline artifacts.
+
+Writers get a temporary path next to the target; it is renamed over the
+target only once writing succeeded, so readers (the backend, the next
+pipeline stage) never see a half-written file.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
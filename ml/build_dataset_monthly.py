@@ -1,6 +1,8 @@
 from pathlib import Path
 import pandas as pd
 
+from atomic import atomic_path
+
 DATA_ROOT = Path(__file__).resolve().parent / "data"
 RAW_DATA_PATH = DATA_ROOT / "raw" / "nps_recreation_visits_monthly.csv"
 OUT_DATA_PATH = DATA_ROOT / "processed" / "modeling_dataset_monthly.csv"
@@ -47,8 +49,8 @@ def main() -> None:
     # Drop rows without enough history
     df = df.dropna()
 
-    OUT_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(OUT_DATA_PATH, index=False)
+    with atomic_path(OUT_DATA_PATH) as tmp:
+        df.to_csv(tmp, index=False)
 
     print(" Monthly modeling dataset created")
     print("Saved to:", OUT_DATA_PATH.resolve())
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+from atomic import atomic_path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = PROJECT_ROOT / "frontend" / "public" / "data"
+SOURCE_PATH = DATA_DIR / "map_by_index.json"
+OUT_PATH = DATA_DIR / "map_by_index.columnar.json"
+
+FORMAT = "columnar-v1"
+CROWD_LEVELS = ["low", "medium", "high"]
+
+
+def to_columnar(data: dict) -> dict:
+    """
+    Columnar form of map_by_index.json (decoded by getMapByIndex in
+    frontend/src/lib/api.ts):
+    - `parks`: one shared table of names + coordinates
+    - `months[i]`: per-field arrays, `park` indexes into `parks`,
+      `crowd_level` indexes into `crowdLevels`
+    """
+    park_index: dict[str, int] = {}
+    parks = {"ParkName": [], "Latitude": [], "Longitude": []}
+    level_code = {lvl: i for i, lvl in enumerate(CROWD_LEVELS)}
+
+    months = []
+    for month in data["months"]:
+        cols = {"index": month["index"], "park": [], "Year": [], "Month": [],
+                "predicted_visits": [], "crowd_level": []}
+        for p in month["parks"]:
+            name = p["ParkName"]
+            if name not in park_index:
+                park_index[name] = len(parks["ParkName"])
+                parks["ParkName"].append(name)
+                parks["Latitude"].append(p["Latitude"])
+                parks["Longitude"].append(p["Longitude"])
+            i = park_index[name]
+            if (parks["Latitude"][i], parks["Longitude"][i]) != (p["Latitude"], p["Longitude"]):
+                raise ValueError(f"Coordinates for {name} differ between months")
+
+            cols["park"].append(i)
+            cols["Year"].append(p["Year"])
+            cols["Month"].append(p["Month"])
+            cols["predicted_visits"].append(p["predicted_visits"])
+            cols["crowd_level"].append(level_code[p["crowd_level"]])
+        months.append(cols)
+
+    return {
+        "format": FORMAT,
+        "baseYear": data["baseYear"],
+        "baseMonth": data["baseMonth"],
+        "crowdLevels": CROWD_LEVELS,
+        "parks": parks,
+        "months": months,
+    }
+
+
+def write_bytes(path: Path, body: bytes) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(body)
+
+
+def main() -> None:
+    data = json.loads(SOURCE_PATH.read_text())
+    body = json.dumps(to_columnar(data), separators=(",", ":")).encode("utf-8")
+
+    write_bytes(OUT_PATH, body)
+    write_bytes(OUT_PATH.with_name(OUT_PATH.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+    print(f"{SOURCE_PATH.name}: {SOURCE_PATH.stat().st_size:,} bytes")
+    print(f"{OUT_PATH.name}: {len(body):,} bytes")
+    print(f"{OUT_PATH.name}.gz: {OUT_PATH.with_name(OUT_PATH.name + '.gz').stat().st_size:,} bytes")
+
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed; skipped .br")
+        return
+    br_path = OUT_PATH.with_name(OUT_PATH.name + ".br")
+    write_bytes(br_path, brotli.compress(body, quality=11))
+    print(f"{br_path.name}: {br_path.stat().st_size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
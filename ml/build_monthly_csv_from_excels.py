@@ -1,9 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import hashlib
 import pandas as pd
 
+from atomic import atomic_path
+
 DATA_ROOT = Path(__file__).resolve().parent / "data"
 INPUT_DIR = DATA_ROOT / "63 park"
 OUTPUT_CSV = DATA_ROOT / "raw" / "nps_recreation_visits_monthly.csv"
+# Parsed long-format table per workbook, keyed by cache_key()
+CACHE_DIR = DATA_ROOT / "cache" / "excels"
 
 MONTH_MAP = {
     "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4,
@@ -59,59 +65,98 @@ def read_monthly_table(file_path: Path) -> pd.DataFrame:
         )
     return df
 
-def main():
-    all_parks = []
-    bad_files = []
+def process_file(file: Path) -> tuple[pd.DataFrame | None, tuple[str, str] | None]:
+    """Parse one park workbook into long format; returns (df, None) or (None, error)."""
+    park_name = file.stem.replace("_", " ").strip()
 
-    excel_files = list(INPUT_DIR.glob("*.xlsx")) + list(INPUT_DIR.glob("*.xls"))
-    if not excel_files:
-        raise FileNotFoundError(f"No Excel files found in {INPUT_DIR.resolve()}")
+    try:
+        df = read_monthly_table(file)
+    except Exception as e:
+        return None, (file.name, str(e))
 
-    for file in excel_files:
-        park_name = file.stem.replace("_", " ").strip()
+    df = df[NEEDED].copy()
 
-        try:
-            df = read_monthly_table(file)
-        except Exception as e:
-            bad_files.append((file.name, str(e)))
-            continue
+    df_long = df.melt(
+        id_vars=["YEAR"],
+        var_name="MonthName",
+        value_name="RecreationVisits"
+    )
 
-        df = df[NEEDED].copy()
+    df_long["Year"] = df_long["YEAR"].astype(int)
+    df_long["Month"] = df_long["MonthName"].map(MONTH_MAP)
+    df_long["ParkName"] = park_name
 
-        df_long = df.melt(
-            id_vars=["YEAR"],
-            var_name="MonthName",
-            value_name="RecreationVisits"
-        )
+    df_long = df_long.dropna(subset=["RecreationVisits"])
 
-        df_long["Year"] = df_long["YEAR"].astype(int)
-        df_long["Month"] = df_long["MonthName"].map(MONTH_MAP)
-        df_long["ParkName"] = park_name
+    df_long["RecreationVisits"] = (
+        df_long["RecreationVisits"]
+        .astype(str)
+        .str.replace(",", "", regex=False)
+        .str.strip()
+    )
+    df_long = df_long[df_long["RecreationVisits"] != ""]
+    df_long["RecreationVisits"] = df_long["RecreationVisits"].astype(float).astype(int)
 
-        df_long = df_long.dropna(subset=["RecreationVisits"])
+    return df_long[["ParkName", "Year", "Month", "RecreationVisits"]], None
 
-        df_long["RecreationVisits"] = (
-            df_long["RecreationVisits"]
-            .astype(str)
-            .str.replace(",", "", regex=False)
-            .str.strip()
-        )
-        df_long = df_long[df_long["RecreationVisits"] != ""]
-        df_long["RecreationVisits"] = df_long["RecreationVisits"].astype(float).astype(int)
+def cache_key(file: Path, parser_source: bytes) -> str:
+    """Hash of the workbook bytes, its name (-> ParkName) and this parser's code."""
+    h = hashlib.sha256(parser_source)
+    h.update(file.name.encode("utf-8"))
+    h.update(file.read_bytes())
+    return h.hexdigest()
 
-        all_parks.append(df_long[["ParkName", "Year", "Month", "RecreationVisits"]])
+def main():
+    all_parks = []
+    bad_files = []
+
+    excel_files = list(INPUT_DIR.glob("*.xlsx")) + list(INPUT_DIR.glob("*.xls"))
+    if not excel_files:
+        raise FileNotFoundError(f"No Excel files found in {INPUT_DIR.resolve()}")
+
+    parser_source = Path(__file__).read_bytes()
+    keys = {file: cache_key(file, parser_source) for file in excel_files}
+    parsed = {}
+    for file, key in keys.items():
+        cached = CACHE_DIR / f"{key}.csv"
+        if cached.exists():
+            parsed[file] = (pd.read_csv(cached), None)
+    misses = [file for file in excel_files if file not in parsed]
+
+    # Workbooks are independent; parse the changed ones in parallel
+    if misses:
+        with ProcessPoolExecutor() as pool:
+            for file, (df_long, error) in zip(misses, pool.map(process_file, misses)):
+                parsed[file] = (df_long, error)
+                if error is None:
+                    with atomic_path(CACHE_DIR / f"{keys[file]}.csv") as tmp:
+                        df_long.to_csv(tmp, index=False)
+
+    # Drop entries for workbooks that changed or were removed
+    live = {f"{key}.csv" for key in keys.values()}
+    for entry in CACHE_DIR.glob("*.csv"):
+        if entry.name not in live:
+            entry.unlink()
+
+    for file in excel_files:
+        df_long, error = parsed[file]
+        if error is not None:
+            bad_files.append(error)
+        else:
+            all_parks.append(df_long)
 
     if not all_parks:
         raise RuntimeError("No valid park files were processed. Check your input files.")
 
     final_df = pd.concat(all_parks, ignore_index=True)
-    OUTPUT_CSV.parent.mkdir(parents=True, exist_ok=True)
-    final_df.to_csv(OUTPUT_CSV, index=False)
+    with atomic_path(OUTPUT_CSV) as tmp:
+        final_df.to_csv(tmp, index=False)
 
     print(" Monthly CSV created successfully")
     print("Saved to:", OUTPUT_CSV.resolve())
     print("Rows:", len(final_df))
     print("Parks processed:", final_df["ParkName"].nunique())
+    print(f"Workbooks parsed: {len(misses)} (cached: {len(excel_files) - len(misses)})")
 
     if bad_files:
         print("\n These files were skipped (re-export them if needed):")
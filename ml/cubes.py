@@ -0,0 +1,174 @@
+# ml/cubes.py
+"""
+Precomputed aggregation cubes over the 36-month forecast.
+
+Rollups (dimension -> key):
+- state_month      state|year|month
+- state_season     state|season|season_year
+- season           season|season_year
+- national_month   year|month
+
+Each cell holds sum / count / crowd-level counts of park-months; mean is
+sum / count. December counts toward the *next* year's winter, so
+"winter 2026" is Dec 2025 - Feb 2026. Keys are lower-cased for lookup.
+
+Visits are accumulated as integer milli-visits so that a park's contribution
+can be subtracted exactly. That makes rebuilds incremental: only parks whose
+forecast rows (or state) changed are removed and re-added.
+
+Forecast park names are matched to parks_metadata.csv through
+park_names.match_parks(); a park without a metadata row fails the build
+instead of being left out of its state's totals.
+
+    python ml/cubes.py        # build/update from the current forecast CSV
+
+The `cubes` stage of ml/pipeline.py runs this after every forecast.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from atomic import atomic_path
+from forecast import month_to_season
+from park_names import match_parks
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FORECAST_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_all_parks_36m.csv"
+META_PATH = PROJECT_ROOT / "ml" / "data" / "parks_metadata.csv"
+CUBES_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "forecast_cubes.json"
+
+CUBES_VERSION = 1
+CROWD_LEVELS = ("low", "medium", "high")
+DIMENSIONS = ("state_month", "state_season", "season", "national_month")
+
+
+def season_year(year: int, month: int) -> int:
+    return year + 1 if month == 12 else year
+
+
+def cell_keys(state: str, year: int, month: int) -> dict[str, str]:
+    """Key of the cube cell a single park-month falls into, per dimension."""
+    season = month_to_season(month)
+    s_year = season_year(year, month)
+    state = state.lower()
+    return {
+        "state_month": f"{state}|{year}|{month}",
+        "state_season": f"{state}|{season}|{s_year}",
+        "season": f"{season}|{s_year}",
+        "national_month": f"{year}|{month}",
+    }
+
+
+def _park_hash(rows: list[list]) -> str:
+    return hashlib.sha1(json.dumps(rows).encode()).hexdigest()
+
+
+def _park_rows(park_df: pd.DataFrame) -> list[list]:
+    park_df = park_df.sort_values(["Year", "Month"])
+    return [
+        [int(y), int(m), int(round(float(v) * 1000)), str(c)]
+        for y, m, v, c in zip(
+            park_df["Year"], park_df["Month"], park_df["predicted_visits"], park_df["crowd_level"]
+        )
+    ]
+
+
+def _apply(cubes: dict, state: str, rows: list[list], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one park's rows from every cube."""
+    for year, month, milli, crowd in rows:
+        for dim, key in cell_keys(state, year, month).items():
+            cell = cubes[dim].setdefault(
+                key, {"sum_milli": 0, "count": 0, **{lvl: 0 for lvl in CROWD_LEVELS}}
+            )
+            cell["sum_milli"] += sign * milli
+            cell["count"] += sign
+            if crowd in CROWD_LEVELS:
+                cell[crowd] += sign
+            if cell["count"] == 0:
+                del cubes[dim][key]
+
+
+def _empty() -> dict:
+    return {"version": CUBES_VERSION, "parks": {}, "cubes": {dim: {} for dim in DIMENSIONS}}
+
+
+def load_cubes(path: Path = CUBES_PATH) -> dict:
+    if not path.exists():
+        return _empty()
+    data = json.loads(path.read_text())
+    if data.get("version") != CUBES_VERSION:
+        return _empty()
+    return data
+
+
+def update_cubes(
+    forecast_df: pd.DataFrame,
+    meta_df: pd.DataFrame,
+    path: Path = CUBES_PATH,
+) -> dict:
+    """
+    Bring the cubes at `path` in line with `forecast_df`, touching only the
+    parks whose rows or state changed. Returns a small summary.
+    """
+    data = load_cubes(path)
+    parks, cubes = data["parks"], data["cubes"]
+
+    fc = forecast_df.copy()
+    fc["ParkName"] = fc["ParkName"].astype(str).str.strip()
+    meta = meta_df.dropna(subset=["State"]).copy()
+    meta["ParkName"] = meta["ParkName"].astype(str).str.strip()
+    states = dict(zip(meta["ParkName"], meta["State"].astype(str).str.strip()))
+
+    official, unmatched = match_parks(fc["ParkName"].unique(), states)
+    if unmatched:
+        raise ValueError(
+            f"No parks_metadata.csv row with a State for forecast park(s): {', '.join(sorted(unmatched))}. "
+            "Add them to the metadata or to park_names.ALIASES."
+        )
+
+    seen = set()
+    changed = []
+    for park, park_df in fc.groupby("ParkName"):
+        seen.add(park)
+        rows = _park_rows(park_df)
+        state = states[official[park]]
+        digest = _park_hash(rows)
+
+        old = parks.get(park)
+        if old is not None and old["hash"] == digest and old["state"] == state:
+            continue
+        if old is not None:
+            _apply(cubes, old["state"], old["rows"], -1)
+        _apply(cubes, state, rows, 1)
+        parks[park] = {"state": state, "hash": digest, "rows": rows}
+        changed.append(park)
+
+    removed = [p for p in parks if p not in seen]
+    for park in removed:
+        _apply(cubes, parks[park]["state"], parks[park]["rows"], -1)
+        del parks[park]
+
+    if changed or removed or not path.exists():
+        data["built_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with atomic_path(path) as tmp:
+            tmp.write_text(json.dumps(data, separators=(",", ":")))
+
+    return {"parks": len(parks), "changed": changed, "removed": removed}
+
+
+def main() -> None:
+    try:
+        summary = update_cubes(pd.read_csv(FORECAST_PATH), pd.read_csv(META_PATH))
+    except ValueError as e:
+        raise SystemExit(f"Cubes not updated: {e}")
+    print(f"Cubes saved -> {CUBES_PATH}")
+    print(f"Parks: {summary['parks']} | updated: {len(summary['changed'])} | removed: {len(summary['removed'])}")
+
+
+if __name__ == "__main__":
+    main()
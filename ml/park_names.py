@@ -0,0 +1,54 @@
+# ml/park_names.py
+"""
+Match forecast park names to the names in parks_metadata.csv.
+
+Forecast ParkNames come from the workbook file names in ml/data/63 park/
+("CanyonsLand", "Bryce canyon", "Mount Rainer", ...), while the metadata
+uses the official names. Names are compared on a key that ignores case,
+spacing, punctuation and diacritics, the same folding the frontend's
+parkSlug() does. The misspellings that survive that folding are listed in
+ALIASES.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+# name_key(workbook name) -> metadata ParkName
+ALIASES = {
+    "blackcanyon": "Black Canyon of the Gunnison",
+    "canyonsland": "Canyonlands",
+    "isleroyalle": "Isle Royale",
+    "katami": "Katmai",
+    "kingscanyoon": "Kings Canyon",
+    "mountrainer": "Mount Rainier",
+}
+
+
+def name_key(name: str) -> str:
+    """"Haleakalā" / "haleakala " -> "haleakala"; "BigBend" / "Big Bend" -> "bigbend"."""
+    folded = unicodedata.normalize("NFKD", str(name))
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return re.sub(r"[^a-z0-9]+", "", folded.lower())
+
+
+def match_parks(names: Iterable[str], official: Iterable[str]) -> tuple[dict[str, str], list[str]]:
+    """
+    Map each of `names` to one of the `official` names.
+    Returns (name -> official name, names with no match).
+    """
+    official = list(official)
+    by_key = {name_key(n): n for n in official}
+    for alias, target in ALIASES.items():
+        if target in official:
+            by_key.setdefault(alias, target)
+
+    matches, unmatched = {}, []
+    for name in names:
+        target = by_key.get(name_key(name))
+        if target is None:
+            unmatched.append(name)
+        else:
+            matches[name] = target
+    return matches, unmatched
@@ -0,0 +1,355 @@
+# ml/pipeline.py
+"""
+Dependency-aware pipeline runner.
+
+Stages form a DAG through their files: a stage depends on whichever stage
+produces one of its inputs. Inputs (data + the stage's own code) and outputs
+are content-hashed; a stage is skipped when its input hashes match the last
+successful run and its outputs are still as that run left them. A stage that
+re-runs but writes byte-identical outputs does not trigger its dependents.
+Independent stages run in parallel. Every stage writes its artifacts through
+`atomic.atomic_path`, so readers never see a half-written file.
+
+    python ml/pipeline.py                # refresh everything that is stale
+    python ml/pipeline.py forecast       # refresh up to (and including) forecast
+    python ml/pipeline.py --dry-run      # show what would run
+    python ml/pipeline.py --force train  # re-run train; upstream stages only if stale
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from atomic import atomic_path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+STATE_PATH = PROJECT_ROOT / "ml" / "data" / ".pipeline_state.json"
+
+
+@dataclass
+class Stage:
+    name: str
+    command: list[str]
+    inputs: list[str]           # data paths / glob patterns relative to PROJECT_ROOT
+    outputs: list[str]          # paths relative to PROJECT_ROOT
+    deps: set[str] = field(default_factory=set)
+    code: list[str] = field(default_factory=list)  # script + local imports, see code_inputs()
+
+
+STAGES = [
+    Stage(
+        name="excels",
+        command=["ml/build_monthly_csv_from_excels.py"],
+        inputs=["ml/data/63 park/*.xls*"],
+        outputs=["ml/data/raw/nps_recreation_visits_monthly.csv"],
+    ),
+    Stage(
+        name="dataset",
+        command=["ml/build_dataset_monthly.py"],
+        inputs=["ml/data/raw/nps_recreation_visits_monthly.csv"],
+        outputs=["ml/data/processed/modeling_dataset_monthly.csv"],
+    ),
+    Stage(
+        name="train",
+        command=["ml/train.py"],
+        inputs=["ml/data/processed/modeling_dataset_monthly.csv"],
+        outputs=[
+            "ml/artifacts/monthly_model.joblib",
+            "ml/artifacts/monthly_actual_vs_pred.png",
+            "frontend/public/model/monthly_actual_vs_pred.png",
+        ],
+    ),
+    Stage(
+        name="forecast",
+        command=["ml/run_forecast.py"],
+        inputs=[
+            "ml/artifacts/monthly_model.joblib",
+            "ml/data/processed/modeling_dataset_monthly.csv",
+        ],
+        outputs=[
+            "ml/data/processed/forecast_all_parks_36m.csv",
+            "ml/data/vintages/manifest.json",
+        ],
+    ),
+    Stage(
+        name="cubes",
+        command=["ml/cubes.py"],
+        inputs=[
+            "ml/data/processed/forecast_all_parks_36m.csv",
+            "ml/data/parks_metadata.csv",
+        ],
+        outputs=["ml/data/processed/forecast_cubes.json"],
+    ),
+    Stage(
+        name="map_static",
+        command=["ml/build_map_static.py"],
+        inputs=["frontend/public/data/map_by_index.json"],
+        # the .br copy is also written when brotli is installed
+        outputs=[
+            "frontend/public/data/map_by_index.columnar.json",
+            "frontend/public/data/map_by_index.columnar.json.gz",
+        ],
+    ),
+    Stage(
+        name="snapshot",
+        command=["backend/snapshot.py"],
+        inputs=[
+            "ml/data/processed/forecast_all_parks_36m.csv",
+            "ml/data/parks_metadata.csv",
+        ],
+        outputs=["ml/data/processed/forecast_snapshot.bin"],
+    ),
+]
+
+
+def code_inputs(script: str) -> list[str]:
+    """
+    `script` plus every module next to it that it imports, transitively
+    (`from atomic import atomic_path`, `import forecast`, `from .x import y`),
+    so editing a shared helper re-runs every stage that uses it.
+    """
+    found, stack = set(), [PROJECT_ROOT / script]
+    while stack:
+        path = stack.pop()
+        rel = path.relative_to(PROJECT_ROOT).as_posix()
+        if rel in found:
+            continue
+        found.add(rel)
+        for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                names = [node.module] if node.module else [alias.name for alias in node.names]
+            else:
+                continue
+            for name in names:
+                local = path.parent / f"{name.split('.')[0]}.py"
+                if local.is_file():
+                    stack.append(local)
+    return sorted(found)
+
+
+def link_stages(stages: list[Stage]) -> dict[str, Stage]:
+    """
+    Fill in `code` from each stage's script and `deps` from output -> input
+    file overlap, and check for cycles.
+    """
+    by_name = {s.name: s for s in stages}
+    producer = {out: s.name for s in stages for out in s.outputs}
+    for s in stages:
+        s.code = code_inputs(s.command[0])
+        s.deps = {producer[i] for i in s.inputs if i in producer and producer[i] != s.name}
+
+    visiting, visited = set(), set()
+
+    def visit(name: str) -> None:
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline has a cycle through stage '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in by_name:
+        visit(name)
+    return by_name
+
+
+# ---------------------------------------------------------------------
+# Content hashing (cached by size + mtime so unchanged files aren't re-read)
+# ---------------------------------------------------------------------
+
+class Hasher:
+    def __init__(self, cache: dict):
+        self.cache = cache
+
+    def file(self, rel: str) -> str | None:
+        path = PROJECT_ROOT / rel
+        if not path.is_file():
+            return None
+        st = path.stat()
+        cached = self.cache.get(rel)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.cache[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def expand(self, patterns: list[str]) -> list[str]:
+        files = []
+        for pattern in patterns:
+            if any(ch in pattern for ch in "*?["):
+                files.extend(
+                    sorted(p.relative_to(PROJECT_ROOT).as_posix() for p in PROJECT_ROOT.glob(pattern))
+                )
+            else:
+                files.append(pattern)
+        return files
+
+    def files(self, patterns: list[str]) -> dict[str, str | None]:
+        return {rel: self.file(rel) for rel in self.expand(patterns)}
+
+
+def load_state() -> dict:
+    if not STATE_PATH.exists():
+        return {"files": {}, "stages": {}}
+    return json.loads(STATE_PATH.read_text())
+
+
+def save_state(state: dict) -> None:
+    with atomic_path(STATE_PATH) as tmp:
+        tmp.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def is_up_to_date(stage: Stage, inputs: dict, hasher: Hasher, state: dict) -> bool:
+    last = state["stages"].get(stage.name)
+    if last is None or last["inputs"] != inputs:
+        return False
+    return hasher.files(stage.outputs) == last["outputs"]
+
+
+# ---------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------
+
+def run_stage(stage: Stage) -> tuple[int, float]:
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, *stage.command], cwd=PROJECT_ROOT)
+    return proc.returncode, time.perf_counter() - t0
+
+
+def select(by_name: dict[str, Stage], targets: list[str]) -> set[str]:
+    """Targets plus everything upstream of them (all stages if no targets)."""
+    if not targets:
+        return set(by_name)
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)}. Stages: {', '.join(by_name)}")
+
+    selected, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in selected:
+            selected.add(name)
+            stack.extend(by_name[name].deps)
+    return selected
+
+
+def run_pipeline(
+    targets: list[str] | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    jobs: int = 2,
+) -> bool:
+    by_name = link_stages(STAGES)
+    selected = select(by_name, targets or [])
+    # --force applies to the named targets, not the upstream stages select() adds
+    forced = set(targets or by_name) if force else set()
+    state = load_state()
+    hasher = Hasher(state["files"])
+
+    pending = [s.name for s in STAGES if s.name in selected]
+    finished: set[str] = set()
+    failed: set[str] = set()
+    would_run: set[str] = set()  # dry run only
+    running: dict[Future, tuple[str, dict]] = {}
+    t_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            progressed = False
+            for name in list(pending):
+                stage = by_name[name]
+                deps = stage.deps & selected
+                if deps & failed:
+                    pending.remove(name)
+                    failed.add(name)
+                    print(f"[{name}] not run: upstream stage failed")
+                    progressed = True
+                    continue
+                if not deps <= finished:
+                    continue
+
+                pending.remove(name)
+                progressed = True
+                # Hash inputs only now: upstream outputs are final at this point
+                inputs = hasher.files(stage.inputs + stage.code)
+                stale = name in forced or not is_up_to_date(stage, inputs, hasher, state)
+                if not stale and not deps & would_run:
+                    print(f"[{name}] up to date, skipped")
+                    finished.add(name)
+                elif dry_run:
+                    if stale:
+                        print(f"[{name}] would run: {' '.join(stage.command)}")
+                    else:
+                        # depends on whether the upstream run changes its outputs
+                        print(f"[{name}] may run: upstream {', '.join(sorted(deps & would_run))} would run")
+                    would_run.add(name)
+                    finished.add(name)
+                else:
+                    print(f"[{name}] running: {' '.join(stage.command)}")
+                    running[pool.submit(run_stage, stage)] = (name, inputs)
+
+            if progressed:
+                continue
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, inputs = running.pop(future)
+                returncode, elapsed = future.result()
+                if returncode != 0:
+                    print(f"[{name}] FAILED (exit {returncode}) after {elapsed:.1f}s")
+                    failed.add(name)
+                    continue
+
+                stage = by_name[name]
+                outputs = hasher.files(stage.outputs)
+                missing = [rel for rel, digest in outputs.items() if digest is None]
+                if missing:
+                    print(f"[{name}] FAILED: expected outputs missing: {', '.join(missing)}")
+                    failed.add(name)
+                    continue
+
+                state["stages"][name] = {"inputs": inputs, "outputs": outputs}
+                save_state(state)
+                finished.add(name)
+                print(f"[{name}] done in {elapsed:.1f}s")
+
+    if not dry_run:
+        save_state(state)
+    print(f"\nPipeline {'FAILED' if failed else 'finished'} in {time.perf_counter() - t_start:.1f}s")
+    return not failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Park Pulse data/model pipeline.")
+    parser.add_argument("stages", nargs="*", help=f"target stages ({', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--force", action="store_true", help="re-run the named stages (all if none named) even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("-j", "--jobs", type=int, default=2, help="stages to run in parallel")
+    args = parser.parse_args()
+
+    ok = run_pipeline(args.stages, force=args.force, dry_run=args.dry_run, jobs=args.jobs)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
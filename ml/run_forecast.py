@@ -1,6 +1,8 @@
 import pandas as pd
 from pathlib import Path
 from forecast import load_pipeline, recursive_forecast_monthly
+from atomic import atomic_path
+from vintages import VintageStore, model_version
 
 def main():
     pipe = load_pipeline()
@@ -33,9 +35,17 @@ def main():
             print(f"Skipping {park} due to error: {e}")
 
     result = pd.concat(all_forecasts, ignore_index=True)
-    result.to_csv(out_path, index=False)
+    with atomic_path(out_path) as tmp:
+        result.to_csv(tmp, index=False)
     print(f"\nSaved → {out_path}")
     print("Rows:", len(result))
 
+    # Keep every run as a vintage (delta vs the previous one) for auditing drift
+    vintage = VintageStore().commit(result, model_version=model_version())
+    print(
+        f"Vintage {vintage['id']} ({vintage['kind']}, model {vintage['model_version']}): "
+        f"{vintage['changed_rows']} rows stored"
+    )
+
 if __name__ == "__main__":
     main()
@@ -13,6 +13,8 @@ from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
+from atomic import atomic_path
+
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "modeling_dataset_monthly.csv"
@@ -160,7 +162,8 @@ def main() -> None:
     # Save plot to artifacts
     ARTIFACTS_PATH.mkdir(parents=True, exist_ok=True)
     plot_path = ARTIFACTS_PATH / "monthly_actual_vs_pred.png"
-    plt.savefig(plot_path, dpi=220, bbox_inches="tight")
+    with atomic_path(plot_path) as tmp:
+        plt.savefig(tmp, dpi=220, bbox_inches="tight", format="png")
     plt.close()
 
     print(f"\nPlot saved to {plot_path}")
@@ -171,14 +174,16 @@ def main() -> None:
     public_plot_dir = PROJECT_ROOT / "frontend" / "public" / "model"
     public_plot_dir.mkdir(parents=True, exist_ok=True)
     public_plot_path = public_plot_dir / "monthly_actual_vs_pred.png"
-    shutil.copyfile(plot_path, public_plot_path)
+    with atomic_path(public_plot_path) as tmp:
+        shutil.copyfile(plot_path, tmp)
 
     print(f"Plot copied to {public_plot_path}")
 
     # ------------------------------------------------------------------
     # Save trained model
     # ------------------------------------------------------------------
-    joblib.dump(pipeline, ARTIFACTS_PATH / "monthly_model.joblib")
+    with atomic_path(ARTIFACTS_PATH / "monthly_model.joblib") as tmp:
+        joblib.dump(pipeline, tmp)
     print("\nModel saved to ml/artifacts/monthly_model.joblib")
 
 
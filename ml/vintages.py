@@ -0,0 +1,323 @@
+# ml/vintages.py
+"""
+Forecast vintage store.
+
+Every `run_forecast.py` run is kept as a vintage, tagged with the model
+version (content hash of the trained model) and the run date.
+
+Each vintage is two tables:
+- rows   (ParkName, Year, Month) -> predicted_visits, crowd_level
+- parks  ParkName -> low_threshold, high_threshold (constant per park)
+
+A vintage is stored either as a full keyframe or as a delta against the
+previous vintage. A delta only holds the rows / parks that were added or
+removed, and for changed rows only the cells that changed (unchanged cells
+are left blank). A keyframe is written instead when the delta would be at
+least KEYFRAME_RATIO of a full copy, or after KEYFRAME_EVERY - 1 deltas, so
+a retrain that moves every value costs at most one full copy and any read
+replays at most KEYFRAME_EVERY files.
+
+Storage only grows sublinearly while most values survive a run: re-runs
+with an unchanged model, or a few parks' inputs changing. The usual monthly
+refresh (retrain + horizon moved forward a month) changes nearly every
+predicted_visits value, so each such vintage is a keyframe and storage
+grows by about one full copy per run. To keep that copy small, values are
+stored rounded to VALUE_DECIMALS (milli-visits, as in ml/cubes.py).
+
+Layout (ml/data/vintages/):
+- manifest.json            ordered list of vintages
+- v0001.rows.csv.gz        keyframe rows
+- v0001.parks.csv.gz       keyframe thresholds
+- v0002.rows.csv.gz        delta vs v0001 (`_op` column: "upsert" / "delete")
+- v0002.parks.csv.gz
+- ...
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from atomic import atomic_path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+VINTAGES_DIR = PROJECT_ROOT / "ml" / "data" / "vintages"
+MODEL_PATH = Path(__file__).parent / "artifacts" / "monthly_model.joblib"
+
+MANIFEST_FORMAT = 2
+
+KEY_COLS = ["ParkName", "Year", "Month"]
+ROW_COLS = ["predicted_visits", "crowd_level"]
+PARK_COLS = ["low_threshold", "high_threshold"]
+VALUE_COLS = ROW_COLS + PARK_COLS
+DTYPES = {
+    "predicted_visits": "float64",
+    "crowd_level": "object",
+    "low_threshold": "float64",
+    "high_threshold": "float64",
+}
+
+# Stored precision of predicted_visits / thresholds (0.001 visits).
+VALUE_DECIMALS = 3
+
+# Relative tolerance below which a re-forecast value counts as unchanged.
+REL_TOL = 1e-9
+
+# Write a full keyframe when a delta is at least this fraction of a full
+# copy, or when this many vintages would otherwise share one keyframe.
+KEYFRAME_RATIO = 0.5
+KEYFRAME_EVERY = 12
+
+
+def model_version(model_path: Path = MODEL_PATH) -> str:
+    """Short content hash of the trained model file."""
+    if not model_path.exists():
+        return "unknown"
+    h = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[KEY_COLS + VALUE_COLS].copy()
+    out["ParkName"] = out["ParkName"].astype(str).str.strip()
+    out["Year"] = out["Year"].astype(int)
+    out["Month"] = out["Month"].astype(int)
+    out = out.astype(DTYPES)
+    floats = [c for c in VALUE_COLS if DTYPES[c] == "float64"]
+    # round before diffing so an unchanged value matches its stored copy
+    out[floats] = out[floats].round(VALUE_DECIMALS)
+    return out.sort_values(KEY_COLS).reset_index(drop=True)
+
+
+def _split(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Full forecast -> (rows indexed by KEY_COLS, thresholds indexed by ParkName)."""
+    rows = df.set_index(KEY_COLS)[ROW_COLS]
+    parks = df.groupby("ParkName")[PARK_COLS].first()
+    return rows, parks
+
+
+def _join(rows: pd.DataFrame, parks: pd.DataFrame) -> pd.DataFrame:
+    df = rows.reset_index().merge(parks, left_on="ParkName", right_index=True, how="left")
+    df["Year"] = df["Year"].astype(int)
+    df["Month"] = df["Month"].astype(int)
+    return df[KEY_COLS + VALUE_COLS].astype(DTYPES).sort_values(KEY_COLS).reset_index(drop=True)
+
+
+def _changed_cols(merged: pd.DataFrame, cols: list[str], old_sfx: str, new_sfx: str) -> pd.DataFrame:
+    """Per-cell change flags for `cols` in a frame merged with both suffixes."""
+    flags = {}
+    for col in cols:
+        old, new = merged[col + old_sfx], merged[col + new_sfx]
+        if DTYPES[col] == "float64":
+            old, new = old.astype(float), new.astype(float)
+            same = (old - new).abs() <= REL_TOL * new.abs().clip(lower=1.0)
+        else:
+            same = old == new
+        flags[col] = ~same
+    return pd.DataFrame(flags, index=merged.index)
+
+
+def _delta(prev: pd.DataFrame, new: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """
+    Delta from `prev` to `new` (same index): deleted keys, added keys with all
+    values, and changed keys with only the changed cells filled in.
+    """
+    names = list(new.index.names)
+    merged = prev.merge(
+        new, left_index=True, right_index=True, how="outer", suffixes=("_prev", ""), indicator=True
+    )
+    added = merged["_merge"] == "right_only"
+    deleted = merged["_merge"] == "left_only"
+    changed = _changed_cols(merged, cols, "_prev", "") & (merged["_merge"] == "both").values[:, None]
+
+    delta = merged[cols].where(changed | added.values[:, None])
+    delta["_op"] = "upsert"
+    delta.loc[deleted, "_op"] = "delete"
+    keep = added | deleted | changed.any(axis=1)
+    delta = delta.loc[keep]
+    delta.index.names = names
+    return delta
+
+
+def _apply(base: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    base = base.drop(delta.index[delta["_op"] == "delete"], errors="ignore")
+    upserts = delta.loc[delta["_op"] == "upsert", list(base.columns)]
+    # non-blank delta cells win; blank cells keep the base value
+    return upserts.combine_first(base)[list(base.columns)]
+
+
+def _gz_csv(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb", mtime=0) as gz:
+        gz.write(df.to_csv(float_format=f"%.{VALUE_DECIMALS}f").encode("utf-8"))
+    return buf.getvalue()
+
+
+def _write_bytes(path: Path, body: bytes) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(body)
+
+
+def _atomic_write_json(obj, path: Path) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_text(json.dumps(obj, indent=2))
+
+
+class VintageStore:
+    def __init__(self, root: Path = VINTAGES_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+
+    # -----------------------------------------------------------------
+    # Manifest
+    # -----------------------------------------------------------------
+
+    def list(self) -> list[dict]:
+        if not self.manifest_path.exists():
+            return []
+        manifest = json.loads(self.manifest_path.read_text())
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported vintage manifest format in {self.manifest_path}")
+        return manifest["vintages"]
+
+    def get(self, vintage_id: str) -> dict:
+        for v in self.list():
+            if v["id"] == vintage_id:
+                return v
+        raise KeyError(f"Unknown vintage '{vintage_id}'")
+
+    def resolve(self, as_of: str) -> str:
+        """
+        Resolve `as_of` to a vintage id. Accepts a vintage id (e.g. "v0003")
+        or an ISO date, meaning the latest vintage run on or before that day.
+        """
+        vintages = self.list()
+        if not vintages:
+            raise KeyError("No forecast vintages recorded yet")
+
+        as_of = as_of.strip()
+        if any(v["id"] == as_of for v in vintages):
+            return as_of
+
+        try:
+            day = date.fromisoformat(as_of)
+        except ValueError:
+            raise KeyError(f"Unknown vintage '{as_of}' (expected a vintage id or YYYY-MM-DD)")
+
+        eligible = [v for v in vintages if date.fromisoformat(v["run_date"]) <= day]
+        if not eligible:
+            raise KeyError(f"No forecast vintage on or before {as_of}")
+        return eligible[-1]["id"]
+
+    # -----------------------------------------------------------------
+    # Read
+    # -----------------------------------------------------------------
+
+    def _chain(self, vintage_id: str, vintages: list[dict]) -> list[dict]:
+        """Entries from the nearest keyframe up to `vintage_id`, oldest first."""
+        by_id = {v["id"]: v for v in vintages}
+        if vintage_id not in by_id:
+            raise KeyError(f"Unknown vintage '{vintage_id}'")
+        chain = [by_id[vintage_id]]
+        while chain[-1]["kind"] != "full":
+            chain.append(by_id[chain[-1]["base"]])
+        return chain[::-1]
+
+    def _read(self, entry: dict, table: str, index: list[str]) -> pd.DataFrame:
+        df = pd.read_csv(self.root / entry["files"][table])
+        return df.set_index(index)
+
+    def _load_tables(self, vintage_id: str, vintages: list[dict]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        rows = parks = None
+        for entry in self._chain(vintage_id, vintages):
+            r = self._read(entry, "rows", KEY_COLS)
+            p = self._read(entry, "parks", ["ParkName"])
+            if entry["kind"] == "full":
+                rows, parks = r, p
+            else:
+                rows, parks = _apply(rows, r), _apply(parks, p)
+        return rows, parks
+
+    def load(self, vintage_id: str) -> pd.DataFrame:
+        """Reconstruct a full forecast by replaying deltas from its keyframe."""
+        rows, parks = self._load_tables(vintage_id, self.list())
+        return _join(rows, parks)
+
+    def diff(self, from_id: str, to_id: str) -> pd.DataFrame:
+        """
+        Changes between two vintages, one row per (ParkName, Year, Month)
+        that was added, removed or changed.
+        """
+        a = self.load(from_id)
+        b = self.load(to_id)
+        merged = a.merge(b, on=KEY_COLS, how="outer", suffixes=("_from", "_to"), indicator=True)
+
+        status = merged["_merge"].map({"left_only": "removed", "right_only": "added", "both": "changed"})
+        both = merged["_merge"] == "both"
+        keep = ~both | _changed_cols(merged, VALUE_COLS, "_from", "_to").any(axis=1)
+
+        merged["change"] = status
+        merged["delta_visits"] = merged["predicted_visits_to"] - merged["predicted_visits_from"]
+        cols = KEY_COLS + ["change"] + [c + s for c in VALUE_COLS for s in ("_from", "_to")] + ["delta_visits"]
+        return merged.loc[keep, cols].sort_values(KEY_COLS).reset_index(drop=True)
+
+    # -----------------------------------------------------------------
+    # Write
+    # -----------------------------------------------------------------
+
+    def commit(
+        self,
+        forecast_df: pd.DataFrame,
+        model_version: str,
+        run_date: date | None = None,
+    ) -> dict:
+        """Record a new vintage and return its manifest entry."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        vintages = self.list()
+        new_rows, new_parks = _split(_normalize(forecast_df))
+
+        vintage_id = f"v{len(vintages) + 1:04d}"
+        entry = {
+            "id": vintage_id,
+            "run_date": (run_date or date.today()).isoformat(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "model_version": model_version,
+            "rows": len(new_rows),
+            "files": {
+                "rows": f"{vintage_id}.rows.csv.gz",
+                "parks": f"{vintage_id}.parks.csv.gz",
+            },
+        }
+
+        full = {"rows": _gz_csv(new_rows), "parks": _gz_csv(new_parks)}
+        full_bytes = sum(len(b) for b in full.values())
+        body, kind = full, "full"
+        entry.update(base=None, changed_rows=len(new_rows), changed_parks=len(new_parks))
+
+        if vintages:
+            base = vintages[-1]
+            chain_len = len(self._chain(base["id"], vintages))
+            if chain_len < KEYFRAME_EVERY:
+                prev_rows, prev_parks = self._load_tables(base["id"], vintages)
+                row_delta = _delta(prev_rows, new_rows, ROW_COLS)
+                park_delta = _delta(prev_parks, new_parks, PARK_COLS)
+                delta = {"rows": _gz_csv(row_delta), "parks": _gz_csv(park_delta)}
+                if sum(len(b) for b in delta.values()) < KEYFRAME_RATIO * full_bytes:
+                    body, kind = delta, "delta"
+                    entry.update(base=base["id"], changed_rows=len(row_delta), changed_parks=len(park_delta))
+
+        for table, blob in body.items():
+            _write_bytes(self.root / entry["files"][table], blob)
+        entry.update(kind=kind, bytes=sum(len(b) for b in body.values()))
+
+        vintages.append(entry)
+        _atomic_write_json({"format": MANIFEST_FORMAT, "vintages": vintages}, self.manifest_path)
+        return entry